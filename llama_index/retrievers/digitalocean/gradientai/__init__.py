@@ -1,5 +1,8 @@
 """DigitalOcean Gradient Knowledge Base retriever integration for LlamaIndex."""
 
-from llama_index.retrievers.digitalocean.gradientai.base import GradientKBRetriever
+from llama_index.retrievers.digitalocean.gradientai.base import (
+    GradientKBResult,
+    GradientKBRetriever,
+)
 
-__all__ = ["GradientKBRetriever"]
+__all__ = ["GradientKBResult", "GradientKBRetriever"]
@@ -1,17 +1,236 @@
 """DigitalOcean Gradient Knowledge Base retriever implementation."""
 
-from typing import Any, Dict, List, Optional
-
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import httpx
+import numpy as np
 from llama_index.core.retrievers import BaseRetriever
-from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+from llama_index.core.schema import NodeWithScore, QueryBundle, QueryType, TextNode
+
+from llama_index.retrievers.digitalocean.gradientai.cache import _ResultCache, _SemanticCache
+from llama_index.retrievers.digitalocean.gradientai.coalesce import _RequestCoalescer
+from llama_index.retrievers.digitalocean.gradientai.mmr import _mmr_select
 
 try:
-    from gradient import AsyncGradient, Gradient
+    from gradient import AsyncGradient, DefaultAsyncHttpxClient, DefaultHttpxClient, Gradient
+    from gradient import BaseModel as GradientBaseModel
 except ImportError as exc:  # pragma: no cover - surfaced at runtime for users
     raise ImportError(
         "gradient is required for GradientKBRetriever. Install with: pip install gradient"
     ) from exc
 
+_json_loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional speedup for raw_response
+    _json_loads = json.loads
+
+# Clients shared by retrievers with identical connection settings, keyed by
+# (api_token, base_url, timeout, http2, max_connections). Tokens stay referenced here
+# until close_all_clients().
+_ClientKey = Tuple[str, Optional[str], float, bool, int]
+_CLIENT_CACHE: Dict[_ClientKey, Gradient] = {}
+# Async clients are additionally bound to the event loop they were created on. A client's
+# pooled connections reference its loop, so entries for closed loops are evicted
+# explicitly (see _evict_closed_loops) rather than relying on weak references.
+_ASYNC_CLIENT_CACHE: Dict[asyncio.AbstractEventLoop, Dict[_ClientKey, AsyncGradient]] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# Sentinel distinguishing "attribute absent" from "attribute set to None"
+_MISSING = object()
+
+# Connection pool defaults, sized for batch fan-out above the SDK's 100/20 limits
+_DEFAULT_MAX_CONNECTIONS = 200
+_DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 50
+
+# Default cap on concurrent in-flight requests for batch retrieval
+_DEFAULT_BATCH_CONCURRENCY = 16
+
+# Upper bound the API accepts for num_results
+_MAX_NUM_RESULTS = 100
+
+# Result attributes copied into node metadata when present on a result
+_METADATA_FIELDS = ("document_id", "chunk_id", "source")
+
+
+def _evict_closed_loops(clients: Dict[asyncio.AbstractEventLoop, Any]) -> None:
+    """Drop entries whose event loop has closed so their clients can be collected.
+
+    Clients of a closed loop cannot be awaited closed any more; dropping the last
+    reference lets their sockets be released by garbage collection.
+    """
+    for loop in [loop for loop in clients if loop.is_closed()]:
+        clients.pop(loop, None)
+
+
+def _query_str(str_or_query_bundle: QueryType) -> str:
+    """Extract the query string from a string or QueryBundle."""
+    if isinstance(str_or_query_bundle, str):
+        return str_or_query_bundle
+    return str_or_query_bundle.query_str
+
+
+class GradientKBResult(NamedTuple):
+    """Lightweight record for one Gradient KB result.
+
+    Returned by ``GradientKBRetriever.retrieve_raw()`` for callers that only need the
+    text, score and metadata and want to skip building LlamaIndex node objects.
+    """
+
+    text: str
+    score: float
+    node_id: str
+    metadata: Dict[str, Any]
+
+    def to_node(self) -> NodeWithScore:
+        """Convert to the NodeWithScore the retriever would have returned."""
+        return NodeWithScore(
+            node=TextNode(text=self.text, metadata=self.metadata, id_=self.node_id),
+            score=self.score,
+        )
+
+
+def _lookup(obj: Any) -> Callable[[str, Any], Any]:
+    """Return a ``(name, default)`` field getter for a response model or decoded JSON dict."""
+    if type(obj) is dict:
+        return obj.get
+    return partial(getattr, obj)
+
+
+_ResultConverter = Callable[[Any, int], Optional[GradientKBResult]]
+
+
+def _convert_result(result: Any, idx: int) -> Optional[GradientKBResult]:
+    """Convert one result of any shape; returns None for results without text."""
+    get = _lookup(result)
+
+    # Extract text content, skipping empty results
+    text_content = get("text_content", None)
+    if not text_content:
+        return None
+
+    # Add document_id, chunk_id and source when the result defines them
+    metadata = {
+        key: value for key in _METADATA_FIELDS if (value := get(key, _MISSING)) is not _MISSING
+    }
+
+    # Add any additional metadata from result; skip None, empty and non-mapping values
+    extra_metadata = get("metadata", None)
+    if extra_metadata and (type(extra_metadata) is dict or isinstance(extra_metadata, Mapping)):
+        metadata.update(extra_metadata)
+
+    # Extract score if available (default to 1.0 if not provided)
+    score = get("score", None)
+    if score is None:
+        score = get("relevance_score", None)
+
+    chunk_id = metadata.get("chunk_id")
+    return GradientKBResult(
+        text_content,
+        1.0 if score is None else float(score),
+        str(chunk_id) if chunk_id else f"gradient_kb_{idx}",
+        metadata,
+    )
+
+
+def _build_converter(result_type: type) -> _ResultConverter:
+    """Return a result converter specialized for ``result_type``.
+
+    A Gradient SDK response model fixes its attribute layout at class level, so the
+    generated function reads declared fields straight from the instance ``__dict__``,
+    reads undeclared names from ``__pydantic_extra__`` only if the model allows extra
+    fields, and leaves out lookups that can never succeed. Any other type (decoded
+    JSON dicts, plain objects) gets the generic ``_convert_result``, as do SDK models
+    built on pydantic v1, which lack ``model_fields``.
+    """
+    if (
+        not issubclass(result_type, GradientBaseModel)
+        or not hasattr(GradientBaseModel, "model_fields")
+        or getattr(result_type, "__getattr__", None)
+        is not getattr(GradientBaseModel, "__getattr__", None)
+        or result_type.__getattribute__ is not GradientBaseModel.__getattribute__
+    ):
+        return _convert_result
+
+    fields = result_type.model_fields
+    allow_extra = result_type.model_config.get("extra") == "allow"
+
+    def source(name: str, default: str) -> Optional[str]:
+        """Expression reading ``name`` from a result, or None if it can never be set."""
+        if name in fields:
+            return f"fields.get({name!r}, {default})"
+        if hasattr(result_type, name):
+            return f"getattr(result, {name!r}, {default})"
+        if allow_extra:
+            return f"extra.get({name!r}, {default})"
+        return None
+
+    lines = ["def convert(result, idx):", "    fields = result.__dict__"]
+    if allow_extra:
+        lines.append("    extra = result.__pydantic_extra__ or empty")
+    lines += [
+        f"    text_content = {source('text_content', 'None')}",
+        "    if not text_content:",
+        "        return None",
+        "    metadata = {}",
+    ]
+    for key in _METADATA_FIELDS:
+        if expr := source(key, "missing"):
+            lines += [
+                f"    value = {expr}",
+                "    if value is not missing:",
+                f"        metadata[{key!r}] = value",
+            ]
+    if expr := source("metadata", "None"):
+        lines += [
+            f"    extra_metadata = {expr}",
+            "    if extra_metadata and (",
+            "        type(extra_metadata) is dict or isinstance(extra_metadata, Mapping)",
+            "    ):",
+            "        metadata.update(extra_metadata)",
+        ]
+    lines.append(f"    score = {source('score', 'None')}")
+    if expr := source("relevance_score", "None"):
+        lines += ["    if score is None:", f"        score = {expr}"]
+    lines += [
+        '    chunk_id = metadata.get("chunk_id")',
+        "    return result_cls(",
+        "        text_content,",
+        "        1.0 if score is None else float(score),",
+        '        str(chunk_id) if chunk_id else f"gradient_kb_{idx}",',
+        "        metadata,",
+        "    )",
+    ]
+
+    namespace: Dict[str, Any] = {
+        "empty": MappingProxyType({}),
+        "missing": _MISSING,
+        "Mapping": Mapping,
+        "result_cls": GradientKBResult,
+    }
+    exec("\n".join(lines), namespace)  # source is assembled from field names only
+    converter: _ResultConverter = namespace["convert"]
+    return converter
+
 
 class GradientKBRetriever(BaseRetriever):
     """DigitalOcean Gradient Knowledge Base Retriever.
@@ -47,9 +266,39 @@ class GradientKBRetriever(BaseRetriever):
         ...     filters={"must": [{"key": "source", "operator": "eq", "value": "docs"}]}
         ... )
         >>>
+        >>> # With an in-process result cache for repeated queries
+        >>> retriever = GradientKBRetriever(
+        ...     knowledge_base_id="kb-uuid",
+        ...     api_token="your-gradient-api-key",
+        ...     enable_cache=True,
+        ...     cache_ttl=600,
+        ... )
+        >>>
+        >>> # With a semantic cache that also matches paraphrased queries
+        >>> retriever = GradientKBRetriever(
+        ...     knowledge_base_id="kb-uuid",
+        ...     api_token="your-gradient-api-key",
+        ...     semantic_cache=True,
+        ...     embed_fn=embed_model.get_query_embedding,
+        ... )
+        >>>
+        >>> # Over-fetch and drop near-duplicate chunks with MMR
+        >>> retriever = GradientKBRetriever(
+        ...     knowledge_base_id="kb-uuid",
+        ...     api_token="your-gradient-api-key",
+        ...     num_results=5,
+        ...     mmr_lambda=0.5,
+        ...     mmr_fetch_k=20,
+        ...     embed_fn=embed_model.get_query_embedding,
+        ...     embed_batch_fn=embed_model.get_text_embedding_batch,
+        ... )
+        >>>
         >>> # Use directly
         >>> nodes = retriever.retrieve("What is machine learning?")
         >>>
+        >>> # Retrieve for several queries concurrently
+        >>> results = retriever.batch_retrieve(["What is ML?", "What is RAG?"])
+        >>>
         >>> # Or with query engine
         >>> query_engine = RetrieverQueryEngine(retriever=retriever)
         >>> response = query_engine.query("What is machine learning?")
@@ -64,6 +313,20 @@ class GradientKBRetriever(BaseRetriever):
         filters: Optional[Dict[str, Any]] = None,
         base_url: Optional[str] = None,
         timeout: float = 60.0,
+        shared_client: bool = True,
+        http2: bool = True,
+        max_connections: int = _DEFAULT_MAX_CONNECTIONS,
+        raw_response: bool = False,
+        coalesce_requests: bool = True,
+        enable_cache: bool = False,
+        cache_maxsize: int = 256,
+        cache_ttl: Optional[float] = 300.0,
+        semantic_cache: bool = False,
+        similarity_threshold: float = 0.95,
+        embed_fn: Optional[Callable[[str], Sequence[float]]] = None,
+        embed_batch_fn: Optional[Callable[[List[str]], Sequence[Sequence[float]]]] = None,
+        mmr_lambda: Optional[float] = None,
+        mmr_fetch_k: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
         """Initialize DigitalOcean Gradient KB Retriever.
@@ -80,15 +343,71 @@ class GradientKBRetriever(BaseRetriever):
                 Example: {"must": [{"key": "source", "operator": "eq", "value": "docs"}]}
             base_url: Optional custom API base URL.
             timeout: Request timeout in seconds (default: 60.0).
+            shared_client: Share HTTP clients (and their connection pools) with other
+                retrievers using the same api_token, base_url and timeout (default: True).
+                Set to False to give this retriever its own isolated clients.
+            http2: Negotiate HTTP/2 so concurrent requests multiplex over one connection,
+                falling back to HTTP/1.1 if the server does not support it (default: True).
+            max_connections: Maximum connections in the HTTP pool (default: 200). Up to
+                50 idle connections are kept alive.
+            raw_response: Decode the raw JSON response directly instead of building the
+                SDK's response models, which dominates client-side parsing time for large
+                ``num_results`` (default: False). Uses ``orjson`` when installed.
+            coalesce_requests: Let concurrent retrievals for the same query share a single
+                in-flight API call (default: True).
+            enable_cache: Cache results in-process, keyed by the normalized query string
+                (default: False). Repeated queries are served without an API call.
+            cache_maxsize: Maximum number of cached queries; least recently used entries
+                are evicted first (default: 256).
+            cache_ttl: Seconds a cached result stays valid, or None to never expire
+                (default: 300.0). Also applies to the semantic cache.
+            semantic_cache: Serve near-duplicate queries from a cache matched by embedding
+                similarity (default: False). Requires ``embed_fn``.
+            similarity_threshold: Minimum cosine similarity for a semantic cache hit
+                (default: 0.95).
+            embed_fn: Query embedder mapping a query string to its embedding vector, e.g.
+                ``embed_model.get_query_embedding``. Used by the semantic cache and for
+                MMR's query similarity.
+            embed_batch_fn: Document embedder mapping a list of chunk texts to their
+                embeddings in one call, e.g. ``embed_model.get_text_embedding_batch``.
+                Used by MMR for the candidates. Kept separate from ``embed_fn`` so
+                models that embed queries and documents differently work correctly.
+            mmr_lambda: Enable maximal marginal relevance deduplication with this
+                relevance/diversity trade-off between 0 and 1 (default: None, disabled).
+                1 ranks purely by query similarity, 0 purely by diversity. Requires
+                ``embed_fn`` and ``embed_batch_fn``.
+            mmr_fetch_k: Number of candidates to fetch before MMR selects
+                ``num_results`` of them (default: 4 * num_results, capped at 100). Only
+                valid together with ``mmr_lambda``.
             **kwargs: Additional arguments passed to BaseRetriever.
 
         Raises:
-            ValueError: If knowledge_base_id or api_token is not provided.
+            ValueError: If knowledge_base_id or api_token is not provided, if the
+                cache or MMR settings are invalid, if semantic_cache or mmr_lambda is set
+                without embed_fn, if mmr_lambda is set without embed_batch_fn, or if
+                mmr_fetch_k is set without mmr_lambda.
         """
         if not knowledge_base_id:
             raise ValueError("knowledge_base_id is required and must be provided.")
         if not api_token:
             raise ValueError("api_token is required and must be provided.")
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1.")
+        if semantic_cache and embed_fn is None:
+            raise ValueError("embed_fn is required when semantic_cache is enabled.")
+        if mmr_lambda is not None:
+            if not 0.0 <= mmr_lambda <= 1.0:
+                raise ValueError("mmr_lambda must be between 0 and 1.")
+            if embed_fn is None:
+                raise ValueError("embed_fn is required when mmr_lambda is set.")
+            if embed_batch_fn is None:
+                raise ValueError("embed_batch_fn is required when mmr_lambda is set.")
+            if mmr_fetch_k is None:
+                mmr_fetch_k = max(num_results, min(num_results * 4, _MAX_NUM_RESULTS))
+            elif mmr_fetch_k < num_results:
+                raise ValueError("mmr_fetch_k must be at least num_results.")
+        elif mmr_fetch_k is not None:
+            raise ValueError("mmr_fetch_k requires mmr_lambda to be set.")
 
         self._knowledge_base_id = knowledge_base_id
         self._api_token = api_token
@@ -97,89 +416,382 @@ class GradientKBRetriever(BaseRetriever):
         self._filters = filters
         self._base_url = base_url
         self._timeout = timeout
+        self._raw_response = raw_response
+        self._coalescer: Optional[_RequestCoalescer] = (
+            _RequestCoalescer() if coalesce_requests else None
+        )
+        # Result converters specialized per response-model type, built on first sight
+        self._converter_cache: Dict[type, _ResultConverter] = {}
+        self._embed_fn = embed_fn
+        self._embed_batch_fn = embed_batch_fn
+        self._mmr_lambda = mmr_lambda
+        self._mmr_fetch_k = mmr_fetch_k
+
+        # Clients are created lazily on first use and reused across calls so that
+        # connection pools (and TLS sessions) survive between retrievals.
+        self._shared_client = shared_client
+        self._http2 = http2
+        self._max_connections = max_connections
+        self._client_key: _ClientKey = (api_token, base_url, timeout, http2, max_connections)
+        self._sync_client: Optional[Gradient] = None
+        self._async_clients: Dict[asyncio.AbstractEventLoop, AsyncGradient] = {}
+
+        self._cache: Optional[_ResultCache] = (
+            _ResultCache(maxsize=cache_maxsize, ttl=cache_ttl) if enable_cache else None
+        )
+        self._semantic_cache: Optional[_SemanticCache] = None
+        if semantic_cache:
+            assert embed_fn is not None
+            self._semantic_cache = _SemanticCache(
+                embed_fn,
+                similarity_threshold=similarity_threshold,
+                maxsize=cache_maxsize,
+                ttl=cache_ttl,
+            )
 
         super().__init__(**kwargs)
 
     @property
     def _client(self) -> Gradient:
-        """Synchronous Gradient client."""
+        """Synchronous Gradient client, created on first access and reused."""
+        if self._shared_client:
+            client = _CLIENT_CACHE.get(self._client_key)
+            if client is None:
+                with _CLIENT_CACHE_LOCK:
+                    client = _CLIENT_CACHE.get(self._client_key)
+                    if client is None:
+                        client = _CLIENT_CACHE[self._client_key] = self._new_client()
+            return client
+
+        if self._sync_client is None:
+            self._sync_client = self._new_client()
+        return self._sync_client
+
+    @property
+    def _async_client(self) -> AsyncGradient:
+        """Asynchronous Gradient client bound to the running event loop.
+
+        One client is created per event loop on first access and reused for every
+        later call on that loop, so its connection pool never crosses loops (which
+        would fail with "attached to a different loop") and survives between calls.
+
+        Clients of event loops that have since closed are evicted whenever a new client
+        is created.
+
+        Raises:
+            RuntimeError: If accessed outside a running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._shared_client:
+            client = _ASYNC_CLIENT_CACHE.get(loop, {}).get(self._client_key)
+            if client is None:
+                with _CLIENT_CACHE_LOCK:
+                    _evict_closed_loops(_ASYNC_CLIENT_CACHE)
+                    loop_clients = _ASYNC_CLIENT_CACHE.setdefault(loop, {})
+                    client = loop_clients.get(self._client_key)
+                    if client is None:
+                        client = loop_clients[self._client_key] = self._new_async_client()
+            return client
+
+        client = self._async_clients.get(loop)
+        if client is None:
+            _evict_closed_loops(self._async_clients)
+            client = self._async_clients[loop] = self._new_async_client()
+        return client
+
+    def _http_client_kwargs(self) -> Dict[str, Any]:
+        """Connection pool settings for the underlying httpx clients."""
+        return {
+            "http2": self._http2,
+            "limits": httpx.Limits(
+                max_connections=self._max_connections,
+                max_keepalive_connections=min(
+                    self._max_connections, _DEFAULT_MAX_KEEPALIVE_CONNECTIONS
+                ),
+            ),
+        }
+
+    def _new_client(self) -> Gradient:
         return Gradient(
             model_access_key=self._api_token,
             base_url=self._base_url,
             timeout=self._timeout,
+            http_client=DefaultHttpxClient(**self._http_client_kwargs()),
         )
 
-    @property
-    def _async_client(self) -> AsyncGradient:
-        """Asynchronous Gradient client."""
+    def _new_async_client(self) -> AsyncGradient:
         return AsyncGradient(
             model_access_key=self._api_token,
             base_url=self._base_url,
             timeout=self._timeout,
+            http_client=DefaultAsyncHttpxClient(**self._http_client_kwargs()),
         )
 
+    def close(self) -> None:
+        """Close this retriever's own synchronous client and release its connection pool.
+
+        Shared clients are left open for other retrievers; use ``close_all_clients()``.
+        """
+        client = getattr(self, "_sync_client", None)
+        if client is not None:
+            self._sync_client = None
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close this retriever's own clients and release their connection pools.
+
+        Async clients bound to other event loops cannot be closed from this one and
+        are dropped instead. Shared clients are left open for other retrievers; use
+        ``aclose_all_clients()``.
+        """
+        self.close()
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        self._async_clients.clear()
+        if client is not None:
+            await client.close()
+
+    @classmethod
+    def close_all_clients(cls) -> None:
+        """Close and forget every shared synchronous client.
+
+        Shared async clients are dropped from the cache as well; use
+        ``aclose_all_clients()`` to also close their connection pools.
+        """
+        with _CLIENT_CACHE_LOCK:
+            clients = list(_CLIENT_CACHE.values())
+            _CLIENT_CACHE.clear()
+            _ASYNC_CLIENT_CACHE.clear()
+        for client in clients:
+            client.close()
+
+    @classmethod
+    async def aclose_all_clients(cls) -> None:
+        """Close and forget every shared client, synchronous and asynchronous.
+
+        Async clients bound to other event loops cannot be closed from this one and
+        are dropped instead.
+        """
+        with _CLIENT_CACHE_LOCK:
+            loop_clients = _ASYNC_CLIENT_CACHE.pop(asyncio.get_running_loop(), {})
+        cls.close_all_clients()
+        for client in loop_clients.values():
+            await client.close()
+
+    @property
+    def cache_hits(self) -> int:
+        """Number of retrievals served from the result cache."""
+        return self._cache.hits if self._cache is not None else 0
+
+    @property
+    def cache_misses(self) -> int:
+        """Number of cache lookups that fell through to the API."""
+        return self._cache.misses if self._cache is not None else 0
+
+    @property
+    def semantic_cache_hits(self) -> int:
+        """Number of retrievals served from the semantic cache."""
+        return self._semantic_cache.hits if self._semantic_cache is not None else 0
+
+    @property
+    def semantic_cache_misses(self) -> int:
+        """Number of semantic cache lookups that found no similar query."""
+        return self._semantic_cache.misses if self._semantic_cache is not None else 0
+
+    def clear_cache(self) -> None:
+        """Drop all cached results (exact and semantic) and reset the counters."""
+        if self._cache is not None:
+            self._cache.clear()
+        self.clear_semantic_cache()
+
+    def clear_semantic_cache(self) -> None:
+        """Drop all semantic cache entries and reset its counters."""
+        if self._semantic_cache is not None:
+            self._semantic_cache.clear()
+
+    def _cache_key(self, query_str: str) -> Tuple[str, int, str]:
+        """Build the result-cache key for a query."""
+        return (self._knowledge_base_id, self._num_results, query_str.strip().casefold())
+
+    def _cache_lookup(
+        self, query_str: str
+    ) -> Tuple[Optional[List[NodeWithScore]], Optional[np.ndarray]]:
+        """Look a query up in the exact, then semantic, cache.
+
+        Returns:
+            Tuple of the cached nodes (None on a miss) and the query embedding computed
+            for the semantic cache, which is handed back to ``_cache_store`` on a miss.
+        """
+        if self._cache is not None:
+            cached = self._cache.get(self._cache_key(query_str))
+            if cached is not None:
+                return cached, None
+
+        embedding = None
+        if self._semantic_cache is not None:
+            embedding = self._semantic_cache.embed(query_str)
+            cached = self._semantic_cache.get(embedding)
+            if cached is not None:
+                return cached, embedding
+
+        return None, embedding
+
+    async def _acache_lookup(
+        self, query_str: str
+    ) -> Tuple[Optional[List[NodeWithScore]], Optional[np.ndarray]]:
+        """Async counterpart of ``_cache_lookup`` that embeds the query off the event loop.
+
+        With the semantic cache enabled, the lookup calls the synchronous ``embed_fn``,
+        so it runs in the loop's default executor instead of blocking other tasks.
+        """
+        if self._semantic_cache is None:
+            return self._cache_lookup(query_str)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._cache_lookup, query_str)
+
+    def _cache_store(
+        self, query_str: str, nodes: List[NodeWithScore], embedding: Optional[np.ndarray]
+    ) -> None:
+        """Populate the enabled caches with freshly retrieved nodes."""
+        if self._cache is not None:
+            self._cache.set(self._cache_key(query_str), nodes)
+        if self._semantic_cache is not None:
+            self._semantic_cache.set(embedding, nodes)
+
+    def _apply_mmr(
+        self,
+        query_str: str,
+        nodes: List[NodeWithScore],
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[NodeWithScore]:
+        """Select ``num_results`` relevant, non-redundant nodes when MMR is enabled.
+
+        The selection is returned in original retrieval order, so the most relevant
+        chunks still come first.
+        """
+        if self._mmr_lambda is None or len(nodes) <= self._num_results:
+            return nodes
+
+        assert self._embed_fn is not None and self._embed_batch_fn is not None
+        if query_embedding is None:
+            query_embedding = np.asarray(self._embed_fn(query_str))
+        embeddings = self._embed_batch_fn([n.node.get_content() for n in nodes])
+        selected = _mmr_select(query_embedding, embeddings, self._num_results, self._mmr_lambda)
+        return [nodes[i] for i in sorted(selected)]
+
+    async def _aapply_mmr(
+        self,
+        query_str: str,
+        nodes: List[NodeWithScore],
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> List[NodeWithScore]:
+        """Async counterpart of ``_apply_mmr`` that embeds candidates off the event loop.
+
+        ``embed_fn`` and ``embed_batch_fn`` are synchronous and typically network calls,
+        so they run in the loop's default executor instead of blocking other tasks.
+        """
+        if self._mmr_lambda is None or len(nodes) <= self._num_results:
+            return nodes
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._apply_mmr, query_str, nodes, query_embedding)
+
+    def _fetch(self, query_str: str) -> Any:
+        """Call the retrieve.documents() API, returning the SDK model or decoded JSON."""
+        api_kwargs = self._build_api_kwargs(query_str)
+        if self._raw_response:
+            raw = self._client.retrieve.with_raw_response.documents(**api_kwargs)
+            return _json_loads(raw.read())
+        return self._client.retrieve.documents(**api_kwargs)
+
+    async def _afetch(self, query_str: str) -> Any:
+        """Asynchronously call the retrieve.documents() API (see ``_fetch``)."""
+        api_kwargs = self._build_api_kwargs(query_str)
+        if self._raw_response:
+            raw = await self._async_client.retrieve.with_raw_response.documents(**api_kwargs)
+            return _json_loads(await raw.read())
+        return await self._async_client.retrieve.documents(**api_kwargs)
+
+    def _build_api_kwargs(self, query_str: str) -> Dict[str, Any]:
+        """Build keyword arguments for the retrieve.documents() API call."""
+        api_kwargs: Dict[str, Any] = {
+            "knowledge_base_id": self._knowledge_base_id,
+            "num_results": self._num_results if self._mmr_fetch_k is None else self._mmr_fetch_k,
+            "query": query_str,
+        }
+
+        # Add optional parameters if set
+        if self._alpha is not None:
+            api_kwargs["alpha"] = self._alpha
+        if self._filters is not None:
+            api_kwargs["filters"] = self._filters
+
+        return api_kwargs
+
+    def __del__(self) -> None:
+        # Best-effort cleanup of owned clients on garbage collection; shared clients
+        # outlive the retriever. The async client cannot be awaited here, so callers
+        # using async retrieval should call ``aclose()``.
+        try:
+            self.close()
+        except Exception:  # pragma: no cover - never raise from __del__
+            pass
+
     def _convert_to_nodes(self, response: Any) -> List[NodeWithScore]:
         """Convert Gradient KB response to LlamaIndex NodeWithScore objects.
 
         Args:
-            response: Response from Gradient retrieve.documents() API.
+            response: Response from Gradient retrieve.documents() API, either the SDK
+                model or its decoded JSON dict.
 
         Returns:
             List of NodeWithScore objects with retrieved content and scores.
         """
-        nodes = []
+        return list(self._iter_nodes(response))
 
-        if not hasattr(response, "results") or not response.results:
-            return nodes
+    def _iter_nodes(self, response: Any) -> Iterator[NodeWithScore]:
+        """Lazily convert Gradient KB response results to NodeWithScore objects.
 
-        for idx, result in enumerate(response.results):
-            # Extract text content
-            text_content = ""
-            if hasattr(result, "text_content"):
-                text_content = result.text_content or ""
-
-            # Skip empty results
-            if not text_content:
-                continue
-
-            # Extract metadata from result
-            metadata = {}
-
-            # Add document ID if available
-            if hasattr(result, "document_id"):
-                metadata["document_id"] = result.document_id
-
-            # Add chunk ID if available
-            if hasattr(result, "chunk_id"):
-                metadata["chunk_id"] = result.chunk_id
-
-            # Add source if available
-            if hasattr(result, "source"):
-                metadata["source"] = result.source
-
-            # Add any additional metadata from result
-            if hasattr(result, "metadata") and result.metadata:
-                metadata.update(result.metadata)
-
-            # Extract score if available (default to 1.0 if not provided)
-            score = 1.0
-            if hasattr(result, "score"):
-                score = float(result.score) if result.score is not None else 1.0
-            elif hasattr(result, "relevance_score"):
-                score = float(result.relevance_score) if result.relevance_score is not None else 1.0
-
-            # Create TextNode
-            node = TextNode(
-                text=text_content,
-                metadata=metadata,
-                id_=str(metadata.get("chunk_id") or f"gradient_kb_{idx}"),
-            )
+        Args:
+            response: Response from Gradient retrieve.documents() API, either the SDK
+                model or its decoded JSON dict.
+
+        Yields:
+            One NodeWithScore per non-empty result, in API ranking order.
+        """
+        # Bind hot names locally to avoid repeated global/attribute lookups in the loop
+        text_node_cls = TextNode
+        node_with_score_cls = NodeWithScore
 
-            # Create NodeWithScore
-            node_with_score = NodeWithScore(node=node, score=score)
-            nodes.append(node_with_score)
+        # Validated constructors are intentional: with pydantic-core, validation is
+        # cheaper than the pure-Python model_construct() path for these models.
+        for result in self._iter_results(response):
+            node = text_node_cls(text=result.text, metadata=result.metadata, id_=result.node_id)
+            yield node_with_score_cls(node=node, score=result.score)
 
-        return nodes
+    def _iter_results(self, response: Any) -> Iterator[GradientKBResult]:
+        """Lazily extract lightweight GradientKBResult records from a response.
+
+        Args:
+            response: Response from Gradient retrieve.documents() API, either the SDK
+                model or its decoded JSON dict.
+
+        Yields:
+            One GradientKBResult per non-empty result, in API ranking order.
+        """
+        results = _lookup(response)("results", None)
+        if not results:
+            return
+
+        converters = self._converter_cache
+        for idx, result in enumerate(results):
+            result_type = type(result)
+            convert = converters.get(result_type)
+            if convert is None:
+                convert = converters[result_type] = _build_converter(result_type)
+            record = convert(result, idx)
+            if record is not None:
+                yield record
 
     def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
         """Retrieve nodes from Gradient Knowledge Base.
@@ -193,24 +805,29 @@ class GradientKBRetriever(BaseRetriever):
         # Extract query string from bundle
         query_str = query_bundle.query_str
 
-        # Build API call kwargs
-        api_kwargs: Dict[str, Any] = {
-            "knowledge_base_id": self._knowledge_base_id,
-            "num_results": self._num_results,
-            "query": query_str,
-        }
+        # Serve repeated or paraphrased queries from the caches when enabled
+        cached, embedding = self._cache_lookup(query_str)
+        if cached is not None:
+            return cached
 
-        # Add optional parameters if set
-        if self._alpha is not None:
-            api_kwargs["alpha"] = self._alpha
-        if self._filters is not None:
-            api_kwargs["filters"] = self._filters
+        # Share one API call between concurrent identical queries when enabled
+        if self._coalescer is not None:
+            return self._coalescer.run(
+                query_str, partial(self._retrieve_uncached, query_str, embedding)
+            )
+        return self._retrieve_uncached(query_str, embedding)
 
+    def _retrieve_uncached(
+        self, query_str: str, embedding: Optional[np.ndarray]
+    ) -> List[NodeWithScore]:
+        """Call the API, convert the response and populate the caches."""
         # Call Gradient KB retrieval API
-        response = self._client.retrieve.documents(**api_kwargs)
+        response = self._fetch(query_str)
 
-        # Convert to NodeWithScore objects
-        return self._convert_to_nodes(response)
+        # Convert to NodeWithScore objects, deduplicating with MMR when enabled
+        nodes = self._apply_mmr(query_str, self._convert_to_nodes(response), embedding)
+        self._cache_store(query_str, nodes, embedding)
+        return nodes
 
     async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
         """Asynchronously retrieve nodes from Gradient Knowledge Base.
@@ -224,21 +841,156 @@ class GradientKBRetriever(BaseRetriever):
         # Extract query string from bundle
         query_str = query_bundle.query_str
 
-        # Build API call kwargs
-        api_kwargs: Dict[str, Any] = {
-            "knowledge_base_id": self._knowledge_base_id,
-            "num_results": self._num_results,
-            "query": query_str,
-        }
+        # Serve repeated or paraphrased queries from the caches when enabled
+        cached, embedding = await self._acache_lookup(query_str)
+        if cached is not None:
+            return cached
 
-        # Add optional parameters if set
-        if self._alpha is not None:
-            api_kwargs["alpha"] = self._alpha
-        if self._filters is not None:
-            api_kwargs["filters"] = self._filters
+        # Share one API call between concurrent identical queries when enabled
+        if self._coalescer is not None:
+            return await self._coalescer.arun(
+                query_str, partial(self._aretrieve_uncached, query_str, embedding)
+            )
+        return await self._aretrieve_uncached(query_str, embedding)
 
+    async def _aretrieve_uncached(
+        self, query_str: str, embedding: Optional[np.ndarray]
+    ) -> List[NodeWithScore]:
+        """Asynchronously call the API, convert the response and populate the caches."""
         # Call Gradient KB retrieval API asynchronously
-        response = await self._async_client.retrieve.documents(**api_kwargs)
+        response = await self._afetch(query_str)
+
+        # Convert to NodeWithScore objects, deduplicating with MMR when enabled
+        nodes = await self._aapply_mmr(query_str, self._convert_to_nodes(response), embedding)
+        self._cache_store(query_str, nodes, embedding)
+        return nodes
+
+    def retrieve_iter(self, str_or_query_bundle: QueryType) -> Iterator[NodeWithScore]:
+        """Retrieve nodes lazily, converting each result only when it is consumed.
+
+        Useful when the caller truncates or deduplicates results and can stop early.
+        With MMR enabled, all candidates are converted up front for selection. Cache
+        hits are served as usual, but streamed results are not added to the cache, and
+        LlamaIndex retrieval callbacks are not fired.
+
+        Args:
+            str_or_query_bundle: Query string or query bundle.
+
+        Returns:
+            Iterator of NodeWithScore objects ranked by relevance.
+        """
+        query_str = _query_str(str_or_query_bundle)
+        cached, _ = self._cache_lookup(query_str)
+        if cached is not None:
+            return iter(cached)
+
+        response = self._fetch(query_str)
+        if self._mmr_lambda is not None:
+            return iter(self._apply_mmr(query_str, self._convert_to_nodes(response)))
+        return self._iter_nodes(response)
+
+    async def aretrieve_iter(self, str_or_query_bundle: QueryType) -> Iterator[NodeWithScore]:
+        """Asynchronously retrieve nodes, converting each result only when consumed.
+
+        The API call is awaited up front; conversion happens lazily as the returned
+        iterator is consumed. Caching and callbacks behave as in ``retrieve_iter``.
+
+        Args:
+            str_or_query_bundle: Query string or query bundle.
+
+        Returns:
+            Iterator of NodeWithScore objects ranked by relevance.
+        """
+        query_str = _query_str(str_or_query_bundle)
+        cached, _ = await self._acache_lookup(query_str)
+        if cached is not None:
+            return iter(cached)
+
+        response = await self._afetch(query_str)
+        if self._mmr_lambda is not None:
+            return iter(await self._aapply_mmr(query_str, self._convert_to_nodes(response)))
+        return self._iter_nodes(response)
+
+    def retrieve_raw(self, str_or_query_bundle: QueryType) -> List[GradientKBResult]:
+        """Retrieve lightweight GradientKBResult records instead of LlamaIndex nodes.
+
+        Skips building TextNode/NodeWithScore objects, which dominate per-result memory,
+        for callers that rerank or truncate before needing nodes; convert survivors
+        with ``GradientKBResult.to_node()``. Results are returned exactly as ranked by
+        the API: caching, coalescing, MMR and retrieval callbacks do not apply.
+
+        Args:
+            str_or_query_bundle: Query string or query bundle.
+
+        Returns:
+            List of GradientKBResult records ranked by relevance.
+        """
+        return list(self._iter_results(self._fetch(_query_str(str_or_query_bundle))))
+
+    async def aretrieve_raw(self, str_or_query_bundle: QueryType) -> List[GradientKBResult]:
+        """Asynchronously retrieve lightweight GradientKBResult records (see ``retrieve_raw``).
+
+        Args:
+            str_or_query_bundle: Query string or query bundle.
+
+        Returns:
+            List of GradientKBResult records ranked by relevance.
+        """
+        response = await self._afetch(_query_str(str_or_query_bundle))
+        return list(self._iter_results(response))
+
+    def batch_retrieve(
+        self,
+        queries: Sequence[QueryType],
+        concurrency: int = _DEFAULT_BATCH_CONCURRENCY,
+    ) -> List[List[NodeWithScore]]:
+        """Retrieve nodes for several queries concurrently.
+
+        Requests are issued from a thread pool so total latency is roughly one round
+        trip rather than one per query.
+
+        Args:
+            queries: Query strings or query bundles.
+            concurrency: Maximum number of requests in flight at once (default: 16).
+
+        Returns:
+            One list of NodeWithScore objects per query, in the same order as ``queries``.
+
+        Raises:
+            ValueError: If concurrency is less than 1.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        if not queries:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(len(queries), concurrency)) as executor:
+            return list(executor.map(self.retrieve, queries))
+
+    async def abatch_retrieve(
+        self,
+        queries: Sequence[QueryType],
+        concurrency: int = _DEFAULT_BATCH_CONCURRENCY,
+    ) -> List[List[NodeWithScore]]:
+        """Asynchronously retrieve nodes for several queries concurrently.
+
+        Args:
+            queries: Query strings or query bundles.
+            concurrency: Maximum number of requests in flight at once (default: 16).
+
+        Returns:
+            One list of NodeWithScore objects per query, in the same order as ``queries``.
+
+        Raises:
+            ValueError: If concurrency is less than 1.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _bounded_retrieve(query: QueryType) -> List[NodeWithScore]:
+            async with semaphore:
+                return await self.aretrieve(query)
 
-        # Convert to NodeWithScore objects
-        return self._convert_to_nodes(response)
+        return list(await asyncio.gather(*(_bounded_retrieve(query) for query in queries)))
@@ -0,0 +1,231 @@
+"""In-process caching of Gradient KB retrieval results."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from llama_index.core.schema import BaseNode, NodeWithScore
+
+
+def _copy_node(node: BaseNode) -> BaseNode:
+    """Shallow-copy a node, giving the copy its own metadata dict."""
+    update = {"metadata": dict(node.metadata)}
+    if hasattr(node, "model_copy"):
+        return node.model_copy(update=update)
+    return node.copy(update=update)  # pydantic-v1 nodes (llama-index-core 0.10)
+
+
+def _copy_nodes(nodes: List[NodeWithScore]) -> List[NodeWithScore]:
+    """Return copies of the nodes so callers can mutate them in place safely.
+
+    Both the NodeWithScore wrapper and the node are copied, since postprocessors such as
+    ``MetadataReplacementPostProcessor`` rewrite node text and metadata in place.
+    """
+    return [NodeWithScore(node=_copy_node(n.node), score=n.score) for n in nodes]
+
+
+class _ResultCache:
+    """Thread-safe LRU cache with per-entry time-to-live.
+
+    Entries are evicted least-recently-used first once ``maxsize`` is exceeded, and
+    lazily on lookup once older than ``ttl`` seconds. A ``ttl`` of None disables expiry.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 300.0) -> None:
+        if maxsize <= 0:
+            raise ValueError("cache_maxsize must be a positive integer.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("cache_ttl must be positive or None.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[float, List[NodeWithScore]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[List[NodeWithScore]]:
+        """Return a copy of the cached nodes for ``key``, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            nodes = entry[1]
+        return _copy_nodes(nodes)
+
+    def set(self, key: Hashable, nodes: List[NodeWithScore]) -> None:
+        """Store ``nodes`` under ``key``, evicting the oldest entries if over capacity."""
+        stored = _copy_nodes(nodes)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - stored_at > self.ttl
+
+
+class _SemanticEntry(NamedTuple):
+    """A cached retrieval result with its normalized query embedding and LSH buckets."""
+
+    stored_at: float
+    embedding: np.ndarray
+    signatures: Tuple[int, ...]
+    nodes: List[NodeWithScore]
+
+
+class _SemanticCache:
+    """Approximate cache that matches paraphrased queries by embedding similarity.
+
+    Query embeddings are bucketed with random-projection locality-sensitive hashing:
+    each of ``num_tables`` tables hashes a vector to ``num_bits`` sign bits. A lookup
+    only compares cosine similarity against entries sharing a bucket in at least one
+    table, and returns the best match at or above ``similarity_threshold``.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], Sequence[float]],
+        similarity_threshold: float = 0.95,
+        maxsize: int = 256,
+        ttl: Optional[float] = 300.0,
+        num_tables: int = 8,
+        num_bits: int = 16,
+    ) -> None:
+        if not 0.0 < similarity_threshold <= 1.0:
+            raise ValueError("similarity_threshold must be in the range (0, 1].")
+        if maxsize <= 0:
+            raise ValueError("cache_maxsize must be a positive integer.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("cache_ttl must be positive or None.")
+
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self.hits = 0
+        self.misses = 0
+
+        # Projections are drawn on first insert, once the embedding dimension is known.
+        self._projections: Optional[np.ndarray] = None
+        self._bit_weights = 1 << np.arange(num_bits, dtype=np.int64)
+        self._rng = np.random.default_rng()
+        self._tables: List[Dict[int, Set[int]]] = [{} for _ in range(num_tables)]
+        self._entries: OrderedDict[int, _SemanticEntry] = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def embed(self, query_str: str) -> Optional[np.ndarray]:
+        """Embed and L2-normalize a query; returns None for degenerate embeddings."""
+        vector = np.asarray(self.embed_fn(query_str), dtype=np.float64)
+        norm = np.linalg.norm(vector)
+        if vector.ndim != 1 or norm == 0.0:
+            return None
+        normalized: np.ndarray = vector / norm
+        return normalized
+
+    def get(self, embedding: Optional[np.ndarray]) -> Optional[List[NodeWithScore]]:
+        """Return a copy of the nodes cached for the most similar query, if any."""
+        if embedding is None:
+            return None
+        with self._lock:
+            nodes = self._lookup(embedding)
+            if nodes is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return _copy_nodes(nodes)
+
+    def set(self, embedding: Optional[np.ndarray], nodes: List[NodeWithScore]) -> None:
+        """Store ``nodes`` under ``embedding``, evicting the oldest entries if over capacity."""
+        if embedding is None:
+            return
+        stored = _copy_nodes(nodes)
+        with self._lock:
+            if self._projections is None:
+                self._projections = self._rng.standard_normal(
+                    (self.num_tables, self.num_bits, embedding.shape[0])
+                )
+            elif self._projections.shape[2] != embedding.shape[0]:
+                return
+            entry_id = self._next_id
+            self._next_id += 1
+            signatures = self._signatures(embedding)
+            self._entries[entry_id] = _SemanticEntry(
+                time.monotonic(), embedding, signatures, stored
+            )
+            for table, signature in zip(self._tables, signatures):
+                table.setdefault(signature, set()).add(entry_id)
+            while len(self._entries) > self.maxsize:
+                self._evict(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            for table in self._tables:
+                table.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _signatures(self, embedding: np.ndarray) -> Tuple[int, ...]:
+        assert self._projections is not None
+        bits = (self._projections @ embedding) > 0
+        return tuple(int(s) for s in bits.astype(np.int64) @ self._bit_weights)
+
+    def _lookup(self, embedding: np.ndarray) -> Optional[List[NodeWithScore]]:
+        if self._projections is None or self._projections.shape[2] != embedding.shape[0]:
+            return None
+
+        candidates: Set[int] = set()
+        for table, signature in zip(self._tables, self._signatures(embedding)):
+            candidates.update(table.get(signature, ()))
+
+        best_id, best_similarity = None, self.similarity_threshold
+        now = time.monotonic()
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if self.ttl is not None and now - entry.stored_at > self.ttl:
+                self._evict(entry_id)
+                continue
+            similarity = float(entry.embedding @ embedding)
+            if similarity >= best_similarity:
+                best_id, best_similarity = entry_id, similarity
+
+        if best_id is None:
+            return None
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id].nodes
+
+    def _evict(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for table, signature in zip(self._tables, entry.signatures):
+            bucket = table.get(signature)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[signature]
@@ -0,0 +1,120 @@
+"""Coalescing of concurrent identical Gradient KB retrieval calls."""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from llama_index.core.schema import NodeWithScore
+
+from llama_index.retrievers.digitalocean.gradientai.cache import _copy_nodes
+
+
+class _InflightCall:
+    """Result slot shared between the thread running a call and threads waiting on it."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[List[NodeWithScore]] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class _InflightFuture:
+    """Result future shared between the task running a call and tasks awaiting it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.future: asyncio.Future = loop.create_future()
+        self.waiters = 0
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared future when the task running the call was cancelled."""
+
+
+class _RequestCoalescer:
+    """Share one upstream call between concurrent callers asking for the same key.
+
+    The first caller for a key runs the call; callers arriving while it is in flight
+    wait for it and receive copies of its result (or its exception); the result is only
+    copied when somebody actually waited. Sync callers
+    coordinate through threads; async callers through futures on their event loop.
+    If an async leader is cancelled, its waiters are not: the first of them retries the
+    call as the new leader.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _InflightCall] = {}
+        self._futures: Dict[Tuple[asyncio.AbstractEventLoop, Hashable], _InflightFuture] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls) + len(self._futures)
+
+    def run(self, key: Hashable, fn: Callable[[], List[NodeWithScore]]) -> List[NodeWithScore]:
+        """Run ``fn`` unless an identical call is already in flight, then share its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = self._calls[key] = _InflightCall()
+            else:
+                call.waiters += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            assert call.result is not None
+            return _copy_nodes(call.result)
+
+        try:
+            nodes = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            # Nobody can join once the entry is removed, so the waiter count is final.
+            with self._lock:
+                del self._calls[key]
+                has_waiters = call.waiters > 0
+            if has_waiters and call.error is None:
+                # Snapshot for waiters, so the leader's caller can mutate its own list.
+                call.result = _copy_nodes(nodes)
+            call.done.set()
+        return nodes
+
+    async def arun(
+        self, key: Hashable, fn: Callable[[], Awaitable[List[NodeWithScore]]]
+    ) -> List[NodeWithScore]:
+        """Async counterpart of ``run`` for callers on the same event loop."""
+        loop = asyncio.get_running_loop()
+        future_key = (loop, key)
+
+        # No await between the lookup and the insert, so this is atomic within the loop.
+        while (call := self._futures.get(future_key)) is not None:
+            call.waiters += 1
+            try:
+                return _copy_nodes(await asyncio.shield(call.future))
+            except _LeaderCancelled:
+                # Only the leader was cancelled; look again and take over if still free.
+                continue
+
+        call = self._futures[future_key] = _InflightFuture(loop)
+        future = call.future
+        try:
+            nodes = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved in case no other caller was waiting.
+            future.exception()
+            raise
+        else:
+            # As in ``run``: all waiters have joined by now, so copy only if there are any.
+            future.set_result(_copy_nodes(nodes) if call.waiters else nodes)
+            return nodes
+        finally:
+            del self._futures[future_key]
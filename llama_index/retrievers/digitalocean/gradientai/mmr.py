@@ -0,0 +1,58 @@
+"""Maximal marginal relevance (MMR) selection for retrieved chunks."""
+
+from typing import List, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    normalized: np.ndarray = matrix / np.where(norms == 0.0, 1.0, norms)
+    return normalized
+
+
+def _mmr_select(
+    query_embedding: npt.ArrayLike,
+    embeddings: npt.ArrayLike,
+    top_k: int,
+    mmr_lambda: float,
+) -> List[int]:
+    """Greedily pick ``top_k`` candidates balancing relevance against redundancy.
+
+    Each step selects ``argmax(λ·sim(q, c) − (1 − λ)·max sim(c, selected))`` using
+    cosine similarity, so λ=1 ranks purely by query similarity and λ=0 purely by
+    diversity.
+
+    Args:
+        query_embedding: Query embedding.
+        embeddings: One embedding per candidate, in retrieval order.
+        top_k: Number of candidates to select.
+        mmr_lambda: Relevance/diversity trade-off between 0 and 1.
+
+    Returns:
+        Indices into ``embeddings`` of the selected candidates, in selection order.
+    """
+    candidates = _normalize_rows(np.asarray(embeddings, dtype=np.float64))
+    if candidates.size == 0 or top_k <= 0:
+        return []
+
+    query = _normalize_rows(np.asarray(query_embedding, dtype=np.float64))
+    relevance = mmr_lambda * (candidates @ query)
+    pairwise = candidates @ candidates.T
+
+    selected: List[int] = []
+    available = np.ones(len(candidates), dtype=bool)
+    max_overlap: Optional[np.ndarray] = None
+
+    for _ in range(min(top_k, len(candidates))):
+        scores = relevance if max_overlap is None else relevance - (1 - mmr_lambda) * max_overlap
+        scores = np.where(available, scores, -np.inf)
+        chosen = int(np.argmax(scores))
+        selected.append(chosen)
+        available[chosen] = False
+        overlap = pairwise[:, chosen]
+        max_overlap = overlap if max_overlap is None else np.maximum(max_overlap, overlap)
+
+    return selected
@@ -1,13 +1,64 @@
 """Tests for GradientKBRetriever."""
 
+import asyncio
+import gc
+import json
 import os
-from unittest.mock import MagicMock, patch
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
 from llama_index.core import QueryBundle
 from llama_index.core.schema import NodeWithScore, TextNode
 
-from llama_index.retrievers.digitalocean.gradientai import GradientKBRetriever
+from llama_index.retrievers.digitalocean.gradientai import GradientKBResult, GradientKBRetriever
+from llama_index.retrievers.digitalocean.gradientai.base import (
+    _ASYNC_CLIENT_CACHE,
+    _build_converter,
+    _convert_result,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_clients():
+    """Drop shared clients so each test sees its own patched Gradient classes."""
+    GradientKBRetriever.close_all_clients()
+    yield
+    GradientKBRetriever.close_all_clients()
+
+
+@pytest.fixture
+def kb_server():
+    """Serve a canned retrieve.documents() response over keep-alive HTTP on localhost."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            body = json.dumps(
+                {"results": [{"text_content": "pooled", "metadata": {}}], "total_results": 1}
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
 
 
 class TestGradientKBRetriever:
@@ -237,7 +288,304 @@ class TestGradientKBRetriever:
             model_access_key="test-token",
             base_url="https://custom.example.com",
             timeout=90.0,
+            http_client=ANY,
+        )
+
+    def test_convert_to_nodes_partial_schema(self):
+        """Test conversion of results lacking optional attributes."""
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+        response = SimpleNamespace(
+            results=[
+                SimpleNamespace(text_content="Only relevance", relevance_score=0.4),
+                SimpleNamespace(text_content="", score=0.9),
+                SimpleNamespace(text_content="No score", source="a.md", score=None),
+                SimpleNamespace(text_content="Odd metadata", chunk_id=7, metadata=["x"]),
+            ]
+        )
+
+        nodes = retriever._convert_to_nodes(response)
+
+        assert [n.node.text for n in nodes] == ["Only relevance", "No score", "Odd metadata"]
+        assert nodes[0].score == 0.4
+        assert nodes[0].node.metadata == {}
+        assert nodes[0].node.id_ == "gradient_kb_0"
+        assert nodes[1].score == 1.0
+        assert nodes[1].node.metadata == {"source": "a.md"}
+        assert nodes[1].node.id_ == "gradient_kb_2"
+        assert nodes[2].node.metadata == {"chunk_id": 7}
+        assert nodes[2].node.id_ == "7"
+
+    def test_convert_sdk_models_matches_decoded_json(self):
+        """Test that SDK models, converted by a specialized converter, match decoded JSON."""
+        from gradient.types.retrieve_documents_response import (
+            Result,
+            RetrieveDocumentsResponse,
+        )
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+        payload = {
+            "results": [
+                {"text_content": "Full", "metadata": {"page": 1}, "chunk_id": "c1", "score": 0.9},
+                {"text_content": "", "metadata": {}},
+                {"text_content": "Relevance", "metadata": {}, "relevance_score": 0.4},
+                {"text_content": "Meta id", "metadata": {"chunk_id": 5}, "source": None},
+            ],
+            "total_results": 4,
+        }
+        response = RetrieveDocumentsResponse.model_validate(payload)
+
+        records = retriever._iter_results(response)
+
+        assert list(records) == list(retriever._iter_results(payload))
+        assert [r.node_id for r in retriever._iter_results(response)] == [
+            "c1",
+            "gradient_kb_2",
+            "5",
+        ]
+        assert retriever._converter_cache[Result] is not retriever._converter_cache[dict]
+
+        # Only Gradient SDK models are specialized; other pydantic models stay generic
+        assert _build_converter(TextNode) is _convert_result
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_client_is_reused_across_retrievals(self, mock_gradient_class):
+        """Test that the Gradient client is built once and reused."""
+        mock_response = MagicMock()
+        mock_response.results = []
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = mock_response
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        retriever.retrieve("first query")
+        retriever.retrieve("second query")
+
+        mock_gradient_class.assert_called_once()
+        assert mock_client.retrieve.documents.call_count == 2
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    async def test_aclose_closes_clients(self, mock_gradient_class, mock_async_gradient_class):
+        """Test that aclose() closes both clients and drops the cached instances."""
+        mock_client = MagicMock()
+        mock_gradient_class.return_value = mock_client
+        mock_async_client = MagicMock()
+        mock_async_client.close = AsyncMock()
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            shared_client=False,
+        )
+        _ = retriever._client
+        _ = retriever._async_client
+
+        await retriever.aclose()
+
+        mock_client.close.assert_called_once()
+        mock_async_client.close.assert_awaited_once()
+        assert retriever._sync_client is None
+        assert len(retriever._async_clients) == 0
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    async def test_shared_clients_across_retrievers(
+        self, mock_gradient_class, mock_async_gradient_class
+    ):
+        """Test that retrievers with the same settings share one client per kind."""
+        mock_gradient_class.side_effect = lambda **kwargs: MagicMock()
+        mock_async_gradient_class.side_effect = lambda **kwargs: MagicMock(close=AsyncMock())
+
+        first = GradientKBRetriever(knowledge_base_id="kb-1", api_token="test-token")
+        second = GradientKBRetriever(knowledge_base_id="kb-2", api_token="test-token")
+        other_token = GradientKBRetriever(knowledge_base_id="kb-1", api_token="other-token")
+        isolated = GradientKBRetriever(
+            knowledge_base_id="kb-1", api_token="test-token", shared_client=False
+        )
+
+        assert first._client is second._client
+        assert first._async_client is second._async_client
+        assert other_token._client is not first._client
+        assert isolated._client is not first._client
+
+        # Closing one retriever leaves shared clients open for the others
+        shared_client = first._client
+        shared_async_client = first._async_client
+        await first.aclose()
+        shared_client.close.assert_not_called()
+
+        await GradientKBRetriever.aclose_all_clients()
+        shared_client.close.assert_called_once()
+        shared_async_client.close.assert_awaited_once()
+        assert second._client is not shared_client
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_retrieve_raw_response(self, mock_gradient_class):
+        """Test that raw_response decodes the JSON body instead of SDK models."""
+        body = {
+            "results": [
+                {"text_content": "Raw content", "metadata": {"chunk_id": "chunk-1", "page": 3}},
+                {"text_content": "", "metadata": {}},
+            ],
+            "total_results": 2,
+        }
+        mock_raw = MagicMock()
+        mock_raw.read.return_value = json.dumps(body).encode()
+
+        mock_client = MagicMock()
+        mock_client.retrieve.with_raw_response.documents.return_value = mock_raw
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            raw_response=True,
+        )
+
+        nodes = retriever.retrieve("test query")
+
+        mock_client.retrieve.with_raw_response.documents.assert_called_once_with(
+            knowledge_base_id="kb-test",
+            num_results=5,
+            query="test query",
+        )
+        mock_client.retrieve.documents.assert_not_called()
+        assert len(nodes) == 1
+        assert nodes[0].node.text == "Raw content"
+        assert nodes[0].node.metadata == {"chunk_id": "chunk-1", "page": 3}
+        assert nodes[0].node.id_ == "chunk-1"
+        assert nodes[0].score == 1.0
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_aretrieve_raw_response(self, mock_async_gradient_class):
+        """Test that raw_response also applies to async retrieval."""
+        body = {"results": [{"text_content": "Async raw", "metadata": {}}], "total_results": 1}
+        mock_raw = MagicMock()
+        mock_raw.read = AsyncMock(return_value=json.dumps(body).encode())
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.with_raw_response.documents = AsyncMock(return_value=mock_raw)
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            raw_response=True,
+        )
+
+        nodes = await retriever.aretrieve("test query")
+
+        assert [n.node.text for n in nodes] == ["Async raw"]
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.DefaultAsyncHttpxClient")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.DefaultHttpxClient")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    async def test_clients_use_http2_and_pool_limits(
+        self,
+        mock_gradient_class,
+        mock_async_gradient_class,
+        mock_http_client_class,
+        mock_async_http_client_class,
+    ):
+        """Test that HTTP/2 and pool limits are configured on both HTTP clients."""
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            max_connections=30,
+        )
+        _ = retriever._client
+        _ = retriever._async_client
+
+        for http_client_class, client_class in (
+            (mock_http_client_class, mock_gradient_class),
+            (mock_async_http_client_class, mock_async_gradient_class),
+        ):
+            kwargs = http_client_class.call_args.kwargs
+            assert kwargs["http2"] is True
+            assert kwargs["limits"].max_connections == 30
+            assert kwargs["limits"].max_keepalive_connections == 30
+            assert client_class.call_args.kwargs["http_client"] is http_client_class.return_value
+
+        http1 = GradientKBRetriever(
+            knowledge_base_id="kb-test", api_token="test-token", http2=False
+        )
+        _ = http1._client
+        assert mock_http_client_class.call_args.kwargs["http2"] is False
+        assert mock_http_client_class.call_args.kwargs["limits"].max_keepalive_connections == 50
+        assert http1._client_key != retriever._client_key
+
+        with pytest.raises(ValueError, match="max_connections"):
+            GradientKBRetriever(
+                knowledge_base_id="kb-test", api_token="test-token", max_connections=0
+            )
+
+    @pytest.mark.parametrize("shared_client", [True, False])
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    def test_async_client_bound_per_event_loop(self, mock_async_gradient_class, shared_client):
+        """Test that each event loop gets its own async client, reused within the loop."""
+        mock_async_gradient_class.side_effect = lambda **kwargs: MagicMock(close=AsyncMock())
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            shared_client=shared_client,
+        )
+
+        async def get_clients():
+            return retriever._async_client, retriever._async_client
+
+        first_loop_clients = asyncio.run(get_clients())
+        second_loop_clients = asyncio.run(get_clients())
+
+        assert first_loop_clients[0] is first_loop_clients[1]
+        assert second_loop_clients[0] is second_loop_clients[1]
+        assert first_loop_clients[0] is not second_loop_clients[0]
+        assert mock_async_gradient_class.call_count == 2
+
+        with pytest.raises(RuntimeError):
+            _ = retriever._async_client
+
+    @pytest.mark.parametrize("shared_client", [True, False])
+    def test_async_clients_of_closed_loops_are_released(self, kb_server, shared_client):
+        """Test that clients whose event loop closed are evicted and their loop collected."""
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            base_url=kb_server,
+            shared_client=shared_client,
         )
+        loops = []
+
+        async def retrieve():
+            loops.append(weakref.ref(asyncio.get_running_loop()))
+            return await retriever.aretrieve("pooled query")
+
+        for _ in range(3):
+            nodes = asyncio.run(retrieve())
+            assert [n.node.text for n in nodes] == ["pooled"]
+
+        clients = _ASYNC_CLIENT_CACHE if shared_client else retriever._async_clients
+        assert len(clients) == 1
+        gc.collect()
+        assert [ref() is None for ref in loops] == [True, True, False]
+
+        GradientKBRetriever.close_all_clients()
+        retriever._async_clients.clear()
+        gc.collect()
+        assert loops[-1]() is None
 
     @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
     def test_retrieve_none_metadata_values(self, mock_gradient_class):
@@ -304,6 +652,712 @@ class TestGradientKBRetriever:
         assert len(nodes) == 1
         assert nodes[0].score == 1.0
 
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_cache_serves_repeated_queries(self, mock_gradient_class):
+        """Test that repeated (normalized) queries hit the cache."""
+        mock_result = MagicMock()
+        mock_result.text_content = "Cached content"
+        mock_result.score = 0.9
+        mock_result.metadata = None
+
+        mock_response = MagicMock()
+        mock_response.results = [mock_result]
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = mock_response
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            enable_cache=True,
+        )
+
+        first = retriever.retrieve("What is ML?")
+        second = retriever.retrieve("  what is ml?  ")
+
+        mock_client.retrieve.documents.assert_called_once()
+        assert retriever.cache_hits == 1
+        assert retriever.cache_misses == 1
+        assert second[0].node.text == first[0].node.text
+        # Mutating a returned score or node must not leak into the cache
+        second[0].score = 0.0
+        second[0].node.set_content("rewritten by postprocessor")
+        second[0].node.metadata["x"] = 1
+        third = retriever.retrieve("what is ml?")
+        assert third[0].score == 0.9
+        assert third[0].node.text == "Cached content"
+        assert "x" not in third[0].node.metadata
+        assert first[0].node.text == "Cached content"
+
+        retriever.clear_cache()
+        retriever.retrieve("What is ML?")
+        assert mock_client.retrieve.documents.call_count == 2
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_cache_disabled_by_default(self, mock_gradient_class):
+        """Test that every call reaches the API when caching is off."""
+        mock_response = MagicMock()
+        mock_response.results = []
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = mock_response
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        retriever.retrieve("same query")
+        retriever.retrieve("same query")
+
+        assert mock_client.retrieve.documents.call_count == 2
+        assert retriever.cache_hits == 0
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.cache.time.monotonic")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_cache_ttl_and_maxsize(self, mock_gradient_class, mock_monotonic):
+        """Test that cache entries expire after the TTL and are evicted LRU-first."""
+        mock_monotonic.return_value = 1000.0
+        mock_response = MagicMock()
+        mock_response.results = []
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = mock_response
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            enable_cache=True,
+            cache_maxsize=2,
+            cache_ttl=10.0,
+        )
+
+        retriever.retrieve("a")
+        retriever.retrieve("b")
+        retriever.retrieve("c")  # evicts "a"
+        assert len(retriever._cache) == 2
+
+        retriever.retrieve("a")
+        assert mock_client.retrieve.documents.call_count == 4
+
+        mock_monotonic.return_value = 1011.0
+        retriever.retrieve("a")  # expired
+        assert mock_client.retrieve.documents.call_count == 5
+
+    def test_cache_invalid_settings(self):
+        """Test that invalid cache settings are rejected."""
+        with pytest.raises(ValueError, match="cache_maxsize"):
+            GradientKBRetriever(
+                knowledge_base_id="kb-test",
+                api_token="test-token",
+                enable_cache=True,
+                cache_maxsize=0,
+            )
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_semantic_cache_serves_similar_queries(self, mock_gradient_class):
+        """Test that paraphrased queries with similar embeddings hit the semantic cache."""
+        embeddings = {
+            "What is ML?": [1.0, 0.0, 0.0],
+            "Explain machine learning": [0.99, 0.05, 0.0],
+            "Best pizza toppings": [0.0, 0.0, 1.0],
+        }
+
+        mock_result = MagicMock()
+        mock_result.text_content = "ML is a subset of AI."
+        mock_result.score = 0.9
+        mock_result.metadata = None
+
+        mock_response = MagicMock()
+        mock_response.results = [mock_result]
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = mock_response
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            semantic_cache=True,
+            similarity_threshold=0.95,
+            embed_fn=embeddings.__getitem__,
+        )
+
+        retriever.retrieve("What is ML?")
+        nodes = retriever.retrieve("Explain machine learning")
+        assert mock_client.retrieve.documents.call_count == 1
+        assert nodes[0].node.text == "ML is a subset of AI."
+        assert retriever.semantic_cache_hits == 1
+
+        retriever.retrieve("Best pizza toppings")
+        assert mock_client.retrieve.documents.call_count == 2
+
+        retriever.clear_semantic_cache()
+        retriever.retrieve("Explain machine learning")
+        assert mock_client.retrieve.documents.call_count == 3
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_async_semantic_cache_embeds_off_event_loop(self, mock_async_gradient_class):
+        """Test that async semantic cache lookups run embed_fn outside the event loop."""
+        embed_threads = set()
+
+        def embed_fn(text):
+            embed_threads.add(threading.get_ident())
+            return [1.0, 0.0] if "ML" in text else [0.99, 0.05]
+
+        mock_result = MagicMock()
+        mock_result.text_content = "ML is a subset of AI."
+        mock_result.score = 0.9
+        mock_result.metadata = None
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = AsyncMock(
+            return_value=MagicMock(results=[mock_result])
+        )
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            semantic_cache=True,
+            embed_fn=embed_fn,
+        )
+
+        await retriever.aretrieve("What is ML?")
+        nodes = await retriever.aretrieve("Explain machine learning")
+
+        assert mock_async_client.retrieve.documents.await_count == 1
+        assert nodes[0].node.text == "ML is a subset of AI."
+        assert embed_threads
+        assert threading.get_ident() not in embed_threads
+
+    def test_semantic_cache_requires_embed_fn(self):
+        """Test that enabling the semantic cache without embed_fn is rejected."""
+        with pytest.raises(ValueError, match="embed_fn is required"):
+            GradientKBRetriever(
+                knowledge_base_id="kb-test",
+                api_token="test-token",
+                semantic_cache=True,
+            )
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_concurrent_identical_queries_are_coalesced(self, mock_async_gradient_class):
+        """Test that identical in-flight async queries share one API call."""
+        release = asyncio.Event()
+        calls = 0
+
+        async def documents(**kwargs):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            mock_result = MagicMock()
+            mock_result.text_content = f"Answer to {kwargs['query']}"
+            mock_result.score = 0.5
+            mock_result.metadata = None
+            return MagicMock(results=[mock_result])
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = documents
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        tasks = [asyncio.ensure_future(retriever.aretrieve("same")) for _ in range(3)]
+        other = asyncio.ensure_future(retriever.aretrieve("other"))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == 2
+        assert (await other)[0].node.text == "Answer to other"
+        assert all(r[0].node.text == "Answer to same" for r in results)
+        assert results[0][0] is not results[1][0]
+        assert len(retriever._coalescer) == 0
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.coalesce._copy_nodes")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    async def test_uncontended_coalesced_calls_do_not_copy(
+        self, mock_gradient_class, mock_async_gradient_class, mock_copy_nodes
+    ):
+        """Test that a coalesced call nobody joined returns its nodes without copying."""
+        mock_result = MagicMock()
+        mock_result.text_content = "Alone"
+        mock_result.score = 0.5
+        mock_result.metadata = None
+        mock_response = MagicMock(results=[mock_result])
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = mock_response
+        mock_gradient_class.return_value = mock_client
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = AsyncMock(return_value=mock_response)
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        assert retriever.retrieve("q")[0].node.text == "Alone"
+        assert (await retriever.aretrieve("q"))[0].node.text == "Alone"
+        mock_copy_nodes.assert_not_called()
+        assert len(retriever._coalescer) == 0
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_cancelled_leader_does_not_cancel_coalesced_followers(
+        self, mock_async_gradient_class
+    ):
+        """Test that a follower takes over the call when the leader task is cancelled."""
+        release = asyncio.Event()
+        calls = 0
+
+        async def documents(**kwargs):
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            mock_result = MagicMock()
+            mock_result.text_content = "Survived"
+            mock_result.score = 0.5
+            mock_result.metadata = None
+            return MagicMock(results=[mock_result])
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = documents
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        leader = asyncio.ensure_future(retriever.aretrieve("q"))
+        followers = [asyncio.ensure_future(retriever.aretrieve("q")) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0.01)  # let a follower take over and start the call
+        release.set()
+        results = await asyncio.gather(*followers)
+
+        assert leader.cancelled()
+        assert not any(f.cancelled() for f in followers)
+        assert all(r[0].node.text == "Survived" for r in results)
+        assert calls == 2
+        assert len(retriever._coalescer) == 0
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_coalesced_sync_calls_share_result_and_errors(self, mock_gradient_class):
+        """Test that threads waiting on an in-flight call get its result or exception."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def documents(**kwargs):
+            started.set()
+            release.wait(timeout=5)
+            if kwargs["query"] == "fail":
+                raise RuntimeError("upstream error")
+            mock_result = MagicMock()
+            mock_result.text_content = "Shared"
+            mock_result.score = 0.5
+            mock_result.metadata = None
+            return MagicMock(results=[mock_result])
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.side_effect = documents
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        for query in ("ok", "fail"):
+            mock_client.retrieve.documents.reset_mock()
+            started.clear()
+            release.clear()
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                leader = executor.submit(retriever.retrieve, query)
+                started.wait(timeout=5)
+                followers = [executor.submit(retriever.retrieve, query) for _ in range(2)]
+                time.sleep(0.1)  # let followers reach the in-flight call
+                release.set()
+                futures = [leader, *followers]
+                if query == "ok":
+                    assert all(f.result()[0].node.text == "Shared" for f in futures)
+                else:
+                    for f in futures:
+                        with pytest.raises(RuntimeError, match="upstream error"):
+                            f.result()
+            assert mock_client.retrieve.documents.call_count == 1
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_coalescing_can_be_disabled(self, mock_gradient_class):
+        """Test that coalesce_requests=False skips the coalescer."""
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = MagicMock(results=[])
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            coalesce_requests=False,
+        )
+
+        assert retriever._coalescer is None
+        assert retriever.retrieve("query") == []
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_retrieve_iter_is_lazy(self, mock_gradient_class):
+        """Test that retrieve_iter converts results only as they are consumed."""
+        results = []
+        for i in range(3):
+            mock_result = MagicMock()
+            mock_result.text_content = f"Content {i}"
+            mock_result.score = 0.9 - (i * 0.1)
+            mock_result.chunk_id = f"chunk-{i}"
+            mock_result.metadata = None
+            results.append(mock_result)
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = MagicMock(results=results)
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        nodes = retriever.retrieve_iter(QueryBundle(query_str="test query"))
+        assert next(nodes).node.text == "Content 0"
+
+        # Results not yet consumed have not been converted
+        results[2].text_content = ""
+        assert [n.node.node_id for n in nodes] == ["chunk-1"]
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_aretrieve_iter(self, mock_async_gradient_class):
+        """Test that aretrieve_iter awaits the API and yields converted nodes."""
+        mock_result = MagicMock()
+        mock_result.text_content = "Async content"
+        mock_result.score = 0.7
+        mock_result.metadata = None
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = AsyncMock(
+            return_value=MagicMock(results=[mock_result])
+        )
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        nodes = list(await retriever.aretrieve_iter("test query"))
+
+        assert [n.node.text for n in nodes] == ["Async content"]
+        assert nodes[0].score == 0.7
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_retrieve_raw(self, mock_gradient_class):
+        """Test that retrieve_raw returns lightweight records convertible to nodes."""
+        mock_result = MagicMock()
+        mock_result.text_content = "Raw record"
+        mock_result.score = 0.6
+        mock_result.document_id = "doc-1"
+        mock_result.chunk_id = "chunk-1"
+        mock_result.source = "a.pdf"
+        mock_result.metadata = {"page": 1}
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = MagicMock(results=[mock_result])
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        records = retriever.retrieve_raw("test query")
+
+        assert records == [
+            GradientKBResult(
+                text="Raw record",
+                score=0.6,
+                node_id="chunk-1",
+                metadata={
+                    "document_id": "doc-1",
+                    "chunk_id": "chunk-1",
+                    "source": "a.pdf",
+                    "page": 1,
+                },
+            )
+        ]
+        node = records[0].to_node()
+        expected = retriever.retrieve("test query")[0]
+        assert node.node.node_id == expected.node.node_id
+        assert node.node.metadata == expected.node.metadata
+        assert node.score == expected.score
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_aretrieve_raw(self, mock_async_gradient_class):
+        """Test that aretrieve_raw awaits the API and returns records."""
+        mock_result = MagicMock()
+        mock_result.text_content = "Async record"
+        mock_result.score = None
+        mock_result.metadata = None
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = AsyncMock(
+            return_value=MagicMock(results=[mock_result])
+        )
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        records = await retriever.aretrieve_raw("test query")
+
+        assert [(r.text, r.score) for r in records] == [("Async record", 1.0)]
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_batch_retrieve(self, mock_gradient_class):
+        """Test that batch_retrieve returns one result list per query, in order."""
+
+        def documents(**kwargs):
+            mock_result = MagicMock()
+            mock_result.text_content = f"Answer to {kwargs['query']}"
+            mock_result.score = 0.5
+            mock_result.metadata = None
+            return MagicMock(results=[mock_result])
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.side_effect = documents
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        queries = [f"query {i}" for i in range(5)]
+        results = retriever.batch_retrieve(queries, concurrency=2)
+
+        assert [r[0].node.text for r in results] == [f"Answer to {q}" for q in queries]
+        assert mock_client.retrieve.documents.call_count == 5
+        assert retriever.batch_retrieve([]) == []
+        with pytest.raises(ValueError, match="concurrency"):
+            retriever.batch_retrieve(queries, concurrency=0)
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_abatch_retrieve_respects_concurrency(self, mock_async_gradient_class):
+        """Test that abatch_retrieve runs queries concurrently up to the cap."""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def documents(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            mock_result = MagicMock()
+            mock_result.text_content = f"Answer to {kwargs['query']}"
+            mock_result.score = 0.5
+            mock_result.metadata = None
+            return MagicMock(results=[mock_result])
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = documents
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+        )
+
+        queries = [f"query {i}" for i in range(6)]
+        results = await retriever.abatch_retrieve(queries, concurrency=3)
+
+        assert [r[0].node.text for r in results] == [f"Answer to {q}" for q in queries]
+        assert max_in_flight == 3
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_mmr_drops_near_duplicates(self, mock_gradient_class):
+        """Test that MMR over-fetches, skips redundant chunks and keeps rank order."""
+        embeddings = {
+            "query": [1.0, 0.0, 0.0],
+            "ML basics": [0.9, 0.1, 0.0],
+            "ML basics (copy)": [0.9, 0.1, 0.0],
+            "ML history": [0.6, 0.0, 0.8],
+            "Unrelated": [0.0, 1.0, 0.0],
+        }
+        results = []
+        for text in ["ML basics", "ML basics (copy)", "ML history", "Unrelated"]:
+            mock_result = MagicMock()
+            mock_result.text_content = text
+            mock_result.score = None
+            mock_result.metadata = None
+            results.append(mock_result)
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = MagicMock(results=results)
+        mock_gradient_class.return_value = mock_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            num_results=2,
+            mmr_lambda=0.5,
+            mmr_fetch_k=4,
+            embed_fn=embeddings.__getitem__,
+            embed_batch_fn=lambda texts: [embeddings[t] for t in texts],
+        )
+
+        nodes = retriever.retrieve("query")
+
+        mock_client.retrieve.documents.assert_called_once_with(
+            knowledge_base_id="kb-test",
+            num_results=4,
+            query="query",
+        )
+        assert [n.node.text for n in nodes] == ["ML basics", "ML history"]
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.Gradient")
+    def test_mmr_embeds_candidates_in_one_batch(self, mock_gradient_class):
+        """Test that MMR embeds candidates with one embed_batch_fn call, the query with embed_fn."""
+        embeddings = {
+            "query": [1.0, 0.0, 0.0],
+            "ML basics": [0.9, 0.1, 0.0],
+            "ML basics (copy)": [0.9, 0.1, 0.0],
+            "ML history": [0.6, 0.0, 0.8],
+        }
+        results = []
+        for text in ["ML basics", "ML basics (copy)", "ML history"]:
+            mock_result = MagicMock()
+            mock_result.text_content = text
+            mock_result.score = None
+            mock_result.metadata = None
+            results.append(mock_result)
+
+        mock_client = MagicMock()
+        mock_client.retrieve.documents.return_value = MagicMock(results=results)
+        mock_gradient_class.return_value = mock_client
+
+        embed_fn = MagicMock(side_effect=embeddings.__getitem__)
+        embed_batch_fn = MagicMock(side_effect=lambda texts: [embeddings[t] for t in texts])
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            num_results=2,
+            mmr_lambda=0.5,
+            mmr_fetch_k=3,
+            embed_fn=embed_fn,
+            embed_batch_fn=embed_batch_fn,
+        )
+
+        nodes = retriever.retrieve("query")
+
+        assert [n.node.text for n in nodes] == ["ML basics", "ML history"]
+        embed_batch_fn.assert_called_once_with(["ML basics", "ML basics (copy)", "ML history"])
+        embed_fn.assert_called_once_with("query")
+
+    @patch("llama_index.retrievers.digitalocean.gradientai.base.AsyncGradient")
+    async def test_async_mmr_embeds_off_event_loop(self, mock_async_gradient_class):
+        """Test that async MMR runs its embedders in an executor, not on the event loop."""
+        embed_threads = set()
+
+        def embed_fn(text):
+            embed_threads.add(threading.get_ident())
+            return [1.0, 0.0] if text.startswith("dup") else [0.0, 1.0]
+
+        results = []
+        for text in ["dup a", "dup b", "other"]:
+            mock_result = MagicMock()
+            mock_result.text_content = text
+            mock_result.score = None
+            mock_result.metadata = None
+            results.append(mock_result)
+
+        mock_async_client = MagicMock()
+        mock_async_client.retrieve.documents = AsyncMock(return_value=MagicMock(results=results))
+        mock_async_gradient_class.return_value = mock_async_client
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            num_results=2,
+            mmr_lambda=0.3,
+            mmr_fetch_k=3,
+            embed_fn=embed_fn,
+            embed_batch_fn=lambda texts: [embed_fn(text) for text in texts],
+        )
+
+        nodes = await retriever.aretrieve("dup query")
+
+        assert [n.node.text for n in nodes] == ["dup a", "other"]
+        assert embed_threads
+        assert threading.get_ident() not in embed_threads
+
+    def test_mmr_invalid_settings(self):
+        """Test that invalid MMR settings are rejected."""
+        with pytest.raises(ValueError, match="embed_fn is required"):
+            GradientKBRetriever(knowledge_base_id="kb-test", api_token="test-token", mmr_lambda=0.5)
+
+        with pytest.raises(ValueError, match="embed_batch_fn is required"):
+            GradientKBRetriever(
+                knowledge_base_id="kb-test",
+                api_token="test-token",
+                mmr_lambda=0.5,
+                embed_fn=lambda text: [1.0],
+            )
+
+        with pytest.raises(ValueError, match="mmr_lambda must be between"):
+            GradientKBRetriever(
+                knowledge_base_id="kb-test",
+                api_token="test-token",
+                mmr_lambda=1.5,
+                embed_fn=lambda text: [1.0],
+                embed_batch_fn=lambda texts: [[1.0] for _ in texts],
+            )
+
+        with pytest.raises(ValueError, match="mmr_fetch_k must be at least"):
+            GradientKBRetriever(
+                knowledge_base_id="kb-test",
+                api_token="test-token",
+                num_results=10,
+                mmr_lambda=0.5,
+                mmr_fetch_k=5,
+                embed_fn=lambda text: [1.0],
+                embed_batch_fn=lambda texts: [[1.0] for _ in texts],
+            )
+
+        with pytest.raises(ValueError, match="mmr_fetch_k requires mmr_lambda"):
+            GradientKBRetriever(
+                knowledge_base_id="kb-test",
+                api_token="test-token",
+                num_results=5,
+                mmr_fetch_k=20,
+            )
+
+        retriever = GradientKBRetriever(
+            knowledge_base_id="kb-test",
+            api_token="test-token",
+            num_results=10,
+            mmr_lambda=0.5,
+            embed_fn=lambda text: [1.0],
+            embed_batch_fn=lambda texts: [[1.0] for _ in texts],
+        )
+        assert retriever._mmr_fetch_k == 40
+
 
 @pytest.mark.integration
 @pytest.mark.skipif(